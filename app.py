@@ -1,10 +1,18 @@
 import streamlit as st
+import atexit
 import os
 import tempfile
+import threading
+import time
+import pandas as pd
 from src.file_processor import FileProcessor
 from src.text_detector import TextDetector
 from src.image_detector import ImageDetector
 from src.audio_detector import AudioDetector
+from src.admission import AdmissionController
+from src.orchestrator import AnalysisJob, AnalysisOrchestrator
+from src.background import BackgroundAnalyzer
+from src.similarity_index import NearDuplicateIndex
 import plotly.graph_objects as go
 import plotly.express as px
 
@@ -23,12 +31,57 @@ def load_css():
 
 load_css()
 
+RESULTS_POLL_INTERVAL = 1.0
+INDEX_SAVE_INTERVAL = 300.0
+
+# Detectors and the background analyzer are shared by every session and
+# survive reruns, so in-flight work is not thrown away when a widget changes
+@st.cache_resource
+def load_similarity_index():
+    index = NearDuplicateIndex.load()
+    saved = [len(index)]
+    
+    def save_if_changed():
+        if len(index) != saved[0]:
+            saved[0] = len(index)
+            index.save()
+    
+    # Streamlit has no shutdown hook, so save on a timer as well as at exit
+    def autosave():
+        while True:
+            time.sleep(INDEX_SAVE_INTERVAL)
+            save_if_changed()
+    
+    threading.Thread(target=autosave, name="deepguard-index-autosave", daemon=True).start()
+    atexit.register(save_if_changed)
+    return index
+
+@st.cache_resource
+def load_detectors():
+    # Both detectors share one index, so re-encoded uploads reuse earlier verdicts
+    index = load_similarity_index()
+    return (FileProcessor(), TextDetector(similarity_index=index),
+            ImageDetector(similarity_index=index), AudioDetector())
+
+@st.cache_resource
+def load_background_analyzer():
+    file_processor, text_detector, image_detector, audio_detector = load_detectors()
+    return BackgroundAnalyzer(AnalysisOrchestrator(
+        text_detector=text_detector,
+        image_detector=image_detector,
+        audio_detector=audio_detector,
+        file_processor=file_processor,
+        admission=AdmissionController(file_processor)
+    ))
+
 class DeepGuardApp:
     def __init__(self):
-        self.file_processor = FileProcessor()
-        self.text_detector = TextDetector()
-        self.image_detector = ImageDetector()
-        self.audio_detector = AudioDetector()
+        self.file_processor, self.text_detector, self.image_detector, self.audio_detector = load_detectors()
+        self.background = load_background_analyzer()
+        self.jobs_pending = False
+        
+        if 'analysis_jobs' not in st.session_state:
+            st.session_state['analysis_jobs'] = {}
         
     def run(self):
         # Header
@@ -58,6 +111,11 @@ class DeepGuardApp:
             self.audio_analysis()
         elif app_mode == "📊 Results History":
             self.results_history()
+        
+        # Poll until every job has finished; the work itself survives reruns
+        if self.jobs_pending:
+            time.sleep(RESULTS_POLL_INTERVAL)
+            st.rerun()
     
     def show_dashboard(self):
         st.header("Welcome to DeepGuard AI")
@@ -93,40 +151,17 @@ class DeepGuardApp:
         # Quick start section
         st.subheader("🚀 Quick Analysis")
         
-        uploaded_file = st.file_uploader(
-            "Upload a file for instant analysis",
+        uploaded_files = st.file_uploader(
+            "Upload files for instant analysis",
             type=['txt', 'pdf', 'docx', 'png', 'jpg', 'jpeg', 'mp3', 'wav'],
+            accept_multiple_files=True,
             help="Supported formats: Text, PDF, DOCX, Images, Audio"
         )
         
-        if uploaded_file is not None:
-            self.quick_analysis(uploaded_file)
-    
-    def quick_analysis(self, uploaded_file):
-        st.info(f"Analyzing: {uploaded_file.name}")
-        
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(uploaded_file.name)[1]) as tmp_file:
-            tmp_file.write(uploaded_file.getvalue())
-            tmp_path = tmp_file.name
+        if uploaded_files and st.button(f"Analyze {len(uploaded_files)} File(s)", key="quick_analyze"):
+            self.submit_uploads("dashboard", uploaded_files)
         
-        try:
-            file_type = self.file_processor.detect_file_type(uploaded_file.name)
-            
-            if file_type == "text":
-                result = self.text_analysis_file(tmp_path)
-            elif file_type == "image":
-                result = self.image_analysis_file(tmp_path)
-            elif file_type == "audio":
-                result = self.audio_analysis_file(tmp_path)
-            else:
-                st.error("Unsupported file type for quick analysis")
-                return
-            
-            self.display_results(result, uploaded_file.name)
-            
-        finally:
-            os.unlink(tmp_path)
+        self.show_job_results("dashboard")
     
     def text_analysis(self):
         st.header("📄 Text Content Analysis")
@@ -141,34 +176,19 @@ class DeepGuardApp:
             )
             if st.button("Analyze Text", key="text_direct"):
                 if text_input.strip():
-                    with st.spinner("Analyzing text content..."):
-                        result = self.text_detector.analyze_text(text_input)
-                        self.display_text_results(result, "Direct Input")
+                    self.track_job("text", AnalysisJob("text", text=text_input, name="Direct Input"))
                 else:
                     st.warning("Please enter some text to analyze")
         
         with tab2:
-            uploaded_file = st.file_uploader(
-                "Upload text file",
+            uploaded_files = st.file_uploader(
+                "Upload text files",
                 type=['txt', 'pdf', 'docx'],
+                accept_multiple_files=True,
                 key="text_upload"
             )
-            if uploaded_file is not None:
-                if st.button("Analyze Uploaded File", key="text_file"):
-                    with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(uploaded_file.name)[1]) as tmp_file:
-                        tmp_file.write(uploaded_file.getvalue())
-                        tmp_path = tmp_file.name
-                    
-                    try:
-                        with st.spinner("Processing and analyzing file..."):
-                            extracted_text = self.file_processor.extract_text(tmp_path)
-                            if extracted_text:
-                                result = self.text_detector.analyze_text(extracted_text)
-                                self.display_text_results(result, uploaded_file.name)
-                            else:
-                                st.error("Could not extract text from the file")
-                    finally:
-                        os.unlink(tmp_path)
+            if uploaded_files and st.button(f"Analyze {len(uploaded_files)} File(s)", key="text_file"):
+                self.submit_uploads("text", uploaded_files, modality="text")
         
         with tab3:
             st.subheader("Detection Settings")
@@ -180,58 +200,124 @@ class DeepGuardApp:
                 help="Higher values require more confidence for AI detection"
             )
             st.info("Advanced model settings can be configured in the configuration files.")
+        
+        # Direct input and uploads share one queue, so both survive polling reruns
+        self.show_job_results("text")
     
     def image_analysis(self):
         st.header("🖼️ Image Content Analysis")
         
-        uploaded_file = st.file_uploader(
-            "Upload an image for analysis",
+        uploaded_files = st.file_uploader(
+            "Upload images for analysis",
             type=['png', 'jpg', 'jpeg', 'bmp', 'tiff'],
+            accept_multiple_files=True,
             key="image_upload"
         )
         
-        if uploaded_file is not None:
-            col1, col2 = st.columns(2)
+        if uploaded_files:
+            st.image(uploaded_files, caption=[f.name for f in uploaded_files], width=160)
             
-            with col1:
-                st.image(uploaded_file, caption="Uploaded Image", use_column_width=True)
-            
-            with col2:
-                if st.button("Analyze Image", key="image_analyze"):
-                    with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(uploaded_file.name)[1]) as tmp_file:
-                        tmp_file.write(uploaded_file.getvalue())
-                        tmp_path = tmp_file.name
-                    
-                    try:
-                        with st.spinner("Analyzing image features..."):
-                            result = self.image_detector.analyze_image(tmp_path)
-                            self.display_image_results(result, uploaded_file.name)
-                    finally:
-                        os.unlink(tmp_path)
+            if st.button(f"Analyze {len(uploaded_files)} Image(s)", key="image_analyze"):
+                self.submit_uploads("image", uploaded_files, modality="image")
+        
+        self.show_job_results("image")
     
     def audio_analysis(self):
         st.header("🎵 Audio Content Analysis")
         
-        uploaded_file = st.file_uploader(
-            "Upload an audio file",
+        uploaded_files = st.file_uploader(
+            "Upload audio files",
             type=['mp3', 'wav', 'flac', 'm4a'],
+            accept_multiple_files=True,
             key="audio_upload"
         )
         
-        if uploaded_file is not None:
-            st.audio(uploaded_file, format=uploaded_file.type)
+        if uploaded_files:
+            if len(uploaded_files) == 1:
+                st.audio(uploaded_files[0], format=uploaded_files[0].type)
+            
+            if st.button(f"Analyze {len(uploaded_files)} File(s)", key="audio_analyze"):
+                self.submit_uploads("audio", uploaded_files, modality="audio")
+        
+        self.show_job_results("audio")
+    
+    def submit_uploads(self, page, uploaded_files, modality=None):
+        """Queue uploads on the background analyzer and track them in session state"""
+        for uploaded_file in uploaded_files:
+            with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(uploaded_file.name)[1]) as tmp_file:
+                tmp_file.write(uploaded_file.getvalue())
+                tmp_path = tmp_file.name
             
-            if st.button("Analyze Audio", key="audio_analyze"):
-                with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(uploaded_file.name)[1]) as tmp_file:
-                    tmp_file.write(uploaded_file.getvalue())
-                    tmp_path = tmp_file.name
-                
-                try:
-                    with st.spinner("Analyzing audio patterns..."):
-                        result = self.audio_detector.analyze_audio(tmp_path)
-                        self.display_audio_results(result, uploaded_file.name)
-                finally:
-                    os.unlink(tmp_path)
+            job = AnalysisJob(
+                modality or self.file_processor.detect_file_type(uploaded_file.name),
+                path=tmp_path,
+                name=uploaded_file.name
+            )
+            self.track_job(page, job, cleanup_path=tmp_path)
+    
+    def track_job(self, page, job, cleanup_path=None):
+        """Queue one job on the background analyzer and record it under a page"""
+        st.session_state['analysis_jobs'].setdefault(page, []).append({
+            'job_id': job.job_id,
+            'name': job.name,
+            'modality': job.modality,
+            'future': self.background.submit(job, cleanup_path=cleanup_path)
+        })
+    
+    def show_job_results(self, page):
+        """Render the progressive results table for a page's background jobs"""
+        jobs = st.session_state['analysis_jobs'].get(page, [])
+        if not jobs:
+            return
+        
+        st.subheader("Analysis Queue")
+        
+        rows = []
+        for job in jobs:
+            result = self.job_result(job)
+            row = {'File': job['name'], 'Type': job['modality'], 'Status': 'pending' if result is None else result['status']}
+            if result is not None and result['status'] == 'done':
+                row['Prediction'] = "🤖 AI-Generated" if result.get('is_ai_generated') else "👤 Human"
+                row['Confidence'] = f"{result.get('confidence', 0):.2%}"
+                row['Time'] = f"{result.get('processing_time', 0):.2f}s"
+                row['Notes'] = result.get('admission', {}).get('reason', '')
+            elif result is not None:
+                row['Notes'] = result.get('error', '')
+            rows.append(row)
+        st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+        
+        pending = [job for job in jobs if not job['future'].done()]
+        for job in pending:
+            if st.button(f"Cancel {job['name']}", key=f"cancel_{page}_{job['job_id']}"):
+                self.background.cancel(job['future'])
+        
+        if not pending and st.button("Clear Results", key=f"clear_{page}"):
+            st.session_state['analysis_jobs'][page] = []
+            st.rerun()
+        
+        # Results stay in session state, so reopening a page never recomputes them
+        display_functions = {
+            'text': self.display_text_results,
+            'image': self.display_image_results,
+            'audio': self.display_audio_results
+        }
+        for job in jobs:
+            result = self.job_result(job)
+            if result is not None and result['status'] == 'done' and job['modality'] in display_functions:
+                with st.expander(f"Details: {job['name']}"):
+                    display_functions[job['modality']](result, job['name'])
+        
+        if pending:
+            self.jobs_pending = True
+    
+    def job_result(self, job):
+        """Return a finished job's result, or None while it is still pending"""
+        future = job['future']
+        if not future.done():
+            return None
+        if future.cancelled():
+            return {'status': 'cancelled', 'error': 'Analysis cancelled'}
+        return future.result()
     
     def results_history(self):
         st.header("📊 Analysis History")
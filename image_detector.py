@@ -3,18 +3,31 @@ import numpy as np
 import time
 from PIL import Image
 import os
+from src.feature_schema import IMAGE_SCHEMA
+from src.scoring import get_scorer
+
+# cv2 can decode JPEGs directly at a fraction of full resolution; other
+# formats are decoded at full size first, so admission only reduces JPEGs
+REDUCED_READ_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8
+}
 
 class ImageDetector:
-    def __init__(self):
+    def __init__(self, similarity_index=None, scorer=None):
         self.initialized = True
+        self.similarity_index = similarity_index
+        self.scorer = scorer or get_scorer('image')
     
-    def analyze_image(self, image_path):
-        """Analyze image for AI generation artifacts"""
+    def analyze_image(self, image_path, reduction=1):
+        """Analyze image for AI generation artifacts, optionally at reduced resolution"""
         start_time = time.time()
         
         try:
             # Load and preprocess image
-            image = cv2.imread(image_path)
+            image = cv2.imread(image_path, REDUCED_READ_FLAGS[reduction])
             if image is None:
                 return {
                     'is_ai_generated': False,
@@ -23,15 +36,30 @@ class ImageDetector:
                     'processing_time': time.time() - start_time
                 }
             
+            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            
+            # Reuse the verdict of a previously scored near-duplicate
+            if self.similarity_index is not None:
+                match = self.similarity_index.lookup_image(gray)
+                if match is not None:
+                    return {
+                        'is_ai_generated': match['is_ai_generated'],
+                        'confidence': match['confidence'],
+                        'ai_probability': match['ai_probability'],
+                        'near_duplicate': {'key': match['key'], 'similarity': match['similarity']},
+                        'processing_time': time.time() - start_time,
+                        'image_dimensions': f"{image.shape[1]}x{image.shape[0]}"
+                    }
+            
             # Extract various image features
-            features = self._extract_image_features(image)
+            features = self._extract_image_features(image, gray)
             
             # Simple heuristic-based detection (would be replaced with actual ML model)
             ai_probability = self._calculate_ai_probability(features)
             confidence = abs(ai_probability - 0.5) * 2
-            is_ai = ai_probability > 0.7
+            is_ai = ai_probability > self.scorer.threshold
             
-            return {
+            result = {
                 'is_ai_generated': is_ai,
                 'confidence': confidence,
                 'ai_probability': ai_probability,
@@ -40,6 +68,11 @@ class ImageDetector:
                 'image_dimensions': f"{image.shape[1]}x{image.shape[0]}"
             }
             
+            if self.similarity_index is not None:
+                self.similarity_index.add_image(gray, result, key=image_path)
+            
+            return result
+            
         except Exception as e:
             return {
                 'is_ai_generated': False,
@@ -48,14 +81,16 @@ class ImageDetector:
                 'processing_time': time.time() - start_time
             }
     
-    def _extract_image_features(self, image):
+    def _extract_image_features(self, image, gray=None):
         """Extract features from image for analysis"""
         # Convert to different color spaces
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        if gray is None:
+            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
         hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
         lab = cv2.cvtColor(image, cv2.COLOR_BGR2LAB)
         
-        features = {}
+        # Full precision so per-item scoring sees the same values the rules were written for
+        features = IMAGE_SCHEMA.empty(np.float64)
         
         # Basic statistics
         features['brightness_mean'] = np.mean(gray)
@@ -92,19 +127,5 @@ class ImageDetector:
     
     def _calculate_ai_probability(self, features):
         """Calculate probability of image being AI-generated"""
-        # This is a simplified heuristic - would be replaced with actual ML model
-        
-        score = 0.5  # Base probability
-        
-        # Adjust based on features (heuristic rules)
-        if features.get('edge_density', 0) < 0.01:
-            score += 0.2  # Very smooth images often AI-generated
-        
-        if features.get('noise_level', 0) < 100:
-            score += 0.1  # Very clean images
-        
-        if features.get('high_freq_energy', 0) > 100:
-            score -= 0.1  # High frequency content often indicates real photos
-        
-        # Normalize to [0, 1]
-        return max(0, min(1, score))
+        # Rules live in the configured scorer so batch jobs can share them
+        return self.scorer.score_record(features)
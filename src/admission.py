@@ -0,0 +1,173 @@
+import os
+import threading
+
+# Rough peak working-set multipliers for each analysis path
+IMAGE_BYTES_PER_PIXEL = 48  # BGR + gray/HSV/LAB copies, float DFT planes, Laplacian
+AUDIO_BYTES_PER_SAMPLE = 64  # float32 signal, STFT/HPSS buffers, spectral features
+PDF_BYTES_PER_PAGE = 256 * 1024
+TEXT_BYTES_PER_BYTE = 16  # Decoded string, tokens, vectorizer output
+
+ANALYSIS_SAMPLE_RATE = 22050
+REDUCED_DECODE_FORMATS = ('JPEG', 'MPO')  # PIL format names cv2 can decode at 1/2, 1/4, 1/8
+
+class AdmissionRejected(Exception):
+    """Raised when an input cannot be processed within the memory budget"""
+
+class MemoryBudget:
+    """Per-process byte budget shared by every concurrent analysis"""
+
+    def __init__(self, limit_bytes):
+        self.limit_bytes = limit_bytes
+        self.used_bytes = 0
+        self._lock = threading.Lock()
+
+    def try_reserve(self, nbytes):
+        """Reserve nbytes if they fit right now, without waiting"""
+        with self._lock:
+            if self.used_bytes + nbytes > self.limit_bytes:
+                return False
+            self.used_bytes += nbytes
+            return True
+
+    def release(self, nbytes):
+        with self._lock:
+            self.used_bytes = max(0, self.used_bytes - nbytes)
+
+_default_budget = None
+_default_budget_lock = threading.Lock()
+
+def get_memory_budget():
+    """Return the process-wide budget, sized by DEEPGUARD_MEMORY_BUDGET_MB"""
+    global _default_budget
+    with _default_budget_lock:
+        if _default_budget is None:
+            limit_mb = int(os.environ.get("DEEPGUARD_MEMORY_BUDGET_MB", "2048"))
+            _default_budget = MemoryBudget(limit_mb * 1024 * 1024)
+        return _default_budget
+
+class AdmissionDecision:
+    """Outcome of admission: accept, downsample (with detector options) or reject"""
+
+    def __init__(self, action, estimated_bytes=0, options=None, reason=None, info=None):
+        self.action = action
+        self.estimated_bytes = estimated_bytes
+        self.options = options or {}
+        self.reason = reason
+        self.info = info or {}
+
+    @property
+    def admitted(self):
+        return self.action != 'reject'
+
+    def __repr__(self):
+        return f"AdmissionDecision({self.action!r}, {self.estimated_bytes}, {self.options!r}, {self.reason!r})"
+
+class AdmissionController:
+    """Estimate decoded memory from file headers and decide how to process an upload"""
+
+    def __init__(self, file_processor, budget=None, item_fraction=0.5,
+                 max_pixels=200_000_000, max_audio_seconds=3 * 3600, max_pdf_pages=5000,
+                 downsample_audio_seconds=600, downsample_pdf_pages=200):
+        self.file_processor = file_processor
+        self.budget = budget or get_memory_budget()
+        self.item_fraction = item_fraction
+        self.max_pixels = max_pixels
+        self.max_audio_seconds = max_audio_seconds
+        self.max_pdf_pages = max_pdf_pages
+        self.downsample_audio_seconds = downsample_audio_seconds
+        self.downsample_pdf_pages = downsample_pdf_pages
+
+    @property
+    def item_limit(self):
+        """Largest estimate a single item may reserve"""
+        return int(self.budget.limit_bytes * self.item_fraction)
+
+    def assess(self, file_path):
+        """Decide how to process a file using only its header"""
+        try:
+            info = self.file_processor.probe(file_path)
+        except Exception as e:
+            # Includes PIL's DecompressionBombError for absurd dimensions
+            return AdmissionDecision('reject', reason=f'Could not read file header: {str(e)}')
+
+        if info['file_type'] == "image":
+            decision = self._assess_image(info)
+        elif info['file_type'] == "audio":
+            decision = self._assess_audio(info)
+        elif info['file_type'] == "text":
+            decision = self._assess_text(info)
+        else:
+            decision = AdmissionDecision('reject', reason='Unsupported file type')
+
+        decision.info = info
+        return decision
+
+    def _assess_image(self, info):
+        pixels = info['width'] * info['height']
+        if pixels > self.max_pixels:
+            return AdmissionDecision('reject', reason=f"Image too large ({info['width']}x{info['height']})")
+
+        estimate = pixels * IMAGE_BYTES_PER_PIXEL
+        if estimate <= self.item_limit:
+            return AdmissionDecision('accept', estimate)
+
+        # Only the JPEG decoder really decodes at reduced scale; other formats are
+        # decoded at full size and then resized, so they cannot be downsampled safely
+        if info.get('format') not in REDUCED_DECODE_FORMATS:
+            return AdmissionDecision('reject', reason='Image exceeds the memory budget')
+
+        # Each reduction step quarters the decoded pixel count
+        for reduction in (2, 4, 8):
+            reduced = estimate // (reduction * reduction)
+            if reduced <= self.item_limit:
+                return AdmissionDecision('downsample', reduced, {'reduction': reduction},
+                                         f'Decoding at 1/{reduction} resolution')
+        return AdmissionDecision('reject', reason='Image exceeds the memory budget even when reduced')
+
+    def _assess_audio(self, info):
+        duration = info['duration']
+        if duration > self.max_audio_seconds:
+            return AdmissionDecision('reject', reason=f'Audio too long ({duration / 60:.0f} min)')
+
+        estimate = int(duration * info['sample_rate'] * AUDIO_BYTES_PER_SAMPLE)
+        if estimate <= self.item_limit:
+            return AdmissionDecision('accept', estimate)
+
+        # Analyze a resampled excerpt instead of the whole recording
+        seconds = min(duration, self.downsample_audio_seconds)
+        sample_rate = min(info['sample_rate'], ANALYSIS_SAMPLE_RATE)
+        reduced = int(seconds * sample_rate * AUDIO_BYTES_PER_SAMPLE)
+        if reduced <= self.item_limit:
+            return AdmissionDecision('downsample', reduced, {'duration': seconds, 'sr': sample_rate},
+                                     f'Analyzing the first {seconds:.0f}s at {sample_rate} Hz')
+        return AdmissionDecision('reject', reason='Audio exceeds the memory budget even when shortened')
+
+    def _assess_text(self, info):
+        if 'uncompressed_size' in info:
+            # A DOCX is a ZIP, so size it by what it expands to: parsed XML costs
+            # like text, embedded media is only held as raw bytes
+            xml_size = info['xml_size']
+            estimate = xml_size * TEXT_BYTES_PER_BYTE + (info['uncompressed_size'] - xml_size)
+            if estimate <= self.item_limit:
+                return AdmissionDecision('accept', estimate)
+            return AdmissionDecision('reject', reason='Document exceeds the memory budget')
+
+        if 'page_count' not in info:
+            estimate = info['size'] * TEXT_BYTES_PER_BYTE
+            if estimate <= self.item_limit:
+                return AdmissionDecision('accept', estimate)
+            return AdmissionDecision('reject', reason='Document exceeds the memory budget')
+
+        pages = info['page_count']
+        if pages > self.max_pdf_pages:
+            return AdmissionDecision('reject', reason=f'PDF has too many pages ({pages})')
+
+        estimate = pages * PDF_BYTES_PER_PAGE
+        if estimate <= self.item_limit:
+            return AdmissionDecision('accept', estimate)
+
+        pages = min(pages, self.downsample_pdf_pages, self.item_limit // PDF_BYTES_PER_PAGE)
+        if pages > 0:
+            return AdmissionDecision('downsample', pages * PDF_BYTES_PER_PAGE, {'max_pages': pages},
+                                     f'Analyzing the first {pages} pages')
+        return AdmissionDecision('reject', reason='PDF exceeds the memory budget')
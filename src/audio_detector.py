@@ -2,18 +2,21 @@ import numpy as np
 import librosa
 import time
 import os
+from src.feature_schema import AUDIO_SCHEMA
+from src.scoring import get_scorer
 
 class AudioDetector:
-    def __init__(self):
+    def __init__(self, scorer=None):
         self.initialized = True
+        self.scorer = scorer or get_scorer('audio')
     
-    def analyze_audio(self, audio_path):
-        """Analyze audio for synthetic generation indicators"""
+    def analyze_audio(self, audio_path, duration=None, sr=None):
+        """Analyze audio for synthetic generation indicators, optionally a capped excerpt"""
         start_time = time.time()
         
         try:
-            # Load audio file
-            y, sr = librosa.load(audio_path, sr=None)
+            # Load audio file (only the first `duration` seconds when capped)
+            y, sr = librosa.load(audio_path, sr=sr, duration=duration)
             
             # Extract audio features
             features = self._extract_audio_features(y, sr)
@@ -21,7 +24,7 @@ class AudioDetector:
             # Calculate AI probability (simplified heuristic)
             ai_probability = self._calculate_ai_probability(features)
             confidence = abs(ai_probability - 0.5) * 2
-            is_ai = ai_probability > 0.65
+            is_ai = ai_probability > self.scorer.threshold
             
             return {
                 'is_ai_generated': is_ai,
@@ -43,7 +46,8 @@ class AudioDetector:
     
     def _extract_audio_features(self, y, sr):
         """Extract comprehensive audio features"""
-        features = {}
+        # Full precision so per-item scoring sees the same values the rules were written for
+        features = AUDIO_SCHEMA.empty(np.float64)
         
         # Basic audio properties
         features['duration'] = len(y) / sr
@@ -84,19 +88,5 @@ class AudioDetector:
     
     def _calculate_ai_probability(self, features):
         """Calculate probability of audio being AI-generated"""
-        # Simplified heuristic - would be replaced with actual ML model
-        
-        score = 0.5  # Base probability
-        
-        # Adjust based on features common in synthetic audio
-        if features.get('zero_crossing_rate', 0) < 0.01:
-            score += 0.15  # Very smooth audio often synthetic
-        
-        if features.get('spectral_centroid_std', 0) < 100:
-            score += 0.1  # Limited spectral variation
-        
-        if features.get('harmonic_ratio', 0) > 0.9:
-            score += 0.1  # Very harmonic content
-        
-        # Normalize to [0, 1]
-        return max(0, min(1, score))
+        # Rules live in the configured scorer so batch jobs can share them
+        return self.scorer.score_record(features)
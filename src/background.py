@@ -0,0 +1,58 @@
+import asyncio
+import os
+import threading
+
+class BackgroundAnalyzer:
+    """Run an AnalysisOrchestrator on a private event loop thread"""
+
+    def __init__(self, orchestrator):
+        self.orchestrator = orchestrator
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="deepguard-background", daemon=True)
+        self._thread.start()
+
+    def submit(self, job, cleanup_path=None):
+        """Schedule a job, deleting cleanup_path once it has finished"""
+        # A concurrent future lets non-async callers poll without owning the work
+        if cleanup_path is None:
+            return asyncio.run_coroutine_threadsafe(self.orchestrator.analyze(job), self._loop)
+
+        # Delete only once the job's worker threads are done with the file, not
+        # when the caller cancels the future. A job cancelled before it ever ran
+        # has no workers, so its file is removed straight away.
+        state = {'started': False, 'abandoned': False}
+        lock = threading.Lock()
+
+        async def run():
+            with lock:
+                if state['abandoned']:
+                    raise asyncio.CancelledError()
+                state['started'] = True
+            return await self.orchestrator.analyze(job, on_idle=lambda: self._remove(cleanup_path))
+
+        def abandon_if_unstarted(_):
+            with lock:
+                if state['started']:
+                    return
+                state['abandoned'] = True
+            self._remove(cleanup_path)
+
+        future = asyncio.run_coroutine_threadsafe(run(), self._loop)
+        future.add_done_callback(abandon_if_unstarted)
+        return future
+
+    def cancel(self, future):
+        """Cancel a submitted job, whether it is still queued or already running"""
+        return future.cancel()
+
+    def shutdown(self):
+        """Stop the event loop thread and release the orchestrator's executors"""
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self.orchestrator.shutdown(wait=False)
+
+    def _remove(self, path):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
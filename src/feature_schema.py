@@ -0,0 +1,150 @@
+import numpy as np
+import struct
+import zlib
+from collections.abc import Mapping
+
+class FeatureSchema:
+    """Fixed, ordered set of feature names for one modality"""
+
+    def __init__(self, modality, names):
+        self.modality = modality
+        self.names = tuple(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        # Fingerprint stored alongside serialized data to catch schema drift
+        self.fingerprint = zlib.crc32('\n'.join(self.names).encode('utf-8'))
+
+    def __len__(self):
+        return len(self.names)
+
+    def empty(self, dtype=np.float32):
+        """Return a zero-filled record for this schema"""
+        return FeatureRecord(self, np.zeros(len(self.names), dtype=dtype))
+
+TEXT_SCHEMA = FeatureSchema('text', [
+    'word_count', 'sentence_count', 'avg_sentence_length', 'avg_word_length',
+    'unique_word_ratio', 'punctuation_density', 'uppercase_ratio', 'digit_ratio',
+    'readability_score'
+])
+
+IMAGE_SCHEMA = FeatureSchema('image', [
+    'brightness_mean', 'brightness_std', 'contrast',
+    'color_std_b', 'color_std_g', 'color_std_r',
+    'edge_density', 'smoothness', 'high_freq_energy', 'noise_level'
+])
+
+AUDIO_SCHEMA = FeatureSchema('audio', [
+    'duration', 'rms_energy', 'zero_crossing_rate',
+    'spectral_centroid_mean', 'spectral_centroid_std', 'spectral_rolloff_mean'
+] + [f'mfcc_{i}_{stat}' for i in range(1, 14) for stat in ('mean', 'std')] + [
+    'chroma_std', 'spectral_contrast_mean', 'tonnetz_std', 'harmonic_ratio'
+])
+
+SCHEMAS = {schema.modality: schema for schema in (TEXT_SCHEMA, IMAGE_SCHEMA, AUDIO_SCHEMA)}
+
+_HEADER = struct.Struct('<4sBIII')
+_MAGIC = b'DGFV'
+_MODALITY_CODES = {'text': 1, 'image': 2, 'audio': 3}
+
+class FeatureRecord(Mapping):
+    """Read-mostly dict view over one feature vector (float32 unless built otherwise)"""
+
+    __slots__ = ('schema', 'values')
+
+    def __init__(self, schema, values):
+        self.schema = schema
+        self.values = values
+
+    def __getitem__(self, name):
+        return float(self.values[self.schema.index[name]])
+
+    def __setitem__(self, name, value):
+        # Only schema names can be set; the layout is fixed
+        self.values[self.schema.index[name]] = value
+
+    def __iter__(self):
+        return iter(self.schema.names)
+
+    def __len__(self):
+        return len(self.schema.names)
+
+    def __contains__(self, name):
+        return name in self.schema.index
+
+    def __repr__(self):
+        return f"FeatureRecord({self.schema.modality}, {self.to_dict()!r})"
+
+    def to_dict(self):
+        """Return a plain dict copy, matching the legacy feature dict form"""
+        return dict(zip(self.schema.names, self.values.tolist()))
+
+    def to_bytes(self):
+        """Serialize to the compact binary feature format"""
+        return FeatureMatrix(self.schema, self.values.reshape(1, -1)).to_bytes()
+
+    @classmethod
+    def from_dict(cls, schema, features, dtype=np.float32):
+        """Build a record from a legacy feature dict, ignoring unknown keys"""
+        record = schema.empty(dtype)
+        for name, value in features.items():
+            if name in schema.index:
+                record[name] = value
+        return record
+
+class FeatureMatrix:
+    """Batch of feature vectors stored as a 2-D float32 array"""
+
+    __slots__ = ('schema', 'data')
+
+    def __init__(self, schema, data):
+        data = np.asarray(data, dtype=np.float32)
+        if data.ndim != 2 or data.shape[1] != len(schema):
+            raise ValueError(f"Expected an (n, {len(schema)}) array for the {schema.modality} schema")
+        self.schema = schema
+        self.data = data
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, row):
+        # Row views share memory with the matrix
+        return FeatureRecord(self.schema, self.data[row])
+
+    def column(self, name):
+        """Return one feature across all rows as a view"""
+        return self.data[:, self.schema.index[name]]
+
+    @classmethod
+    def from_records(cls, records, schema=None):
+        """Stack records (or legacy dicts) into a matrix"""
+        records = list(records)
+        if schema is None:
+            if not records or not isinstance(records[0], FeatureRecord):
+                raise ValueError("A schema is required for empty or dict-based batches")
+            schema = records[0].schema
+        rows = [
+            r.values if isinstance(r, FeatureRecord) else FeatureRecord.from_dict(schema, r).values
+            for r in records
+        ]
+        data = np.vstack(rows) if rows else np.empty((0, len(schema)), dtype=np.float32)
+        return cls(schema, data)
+
+    def to_bytes(self):
+        """Serialize to a small header followed by raw little-endian float32 rows"""
+        header = _HEADER.pack(_MAGIC, _MODALITY_CODES[self.schema.modality],
+                              self.schema.fingerprint, self.data.shape[0], self.data.shape[1])
+        return header + self.data.astype('<f4', copy=False).tobytes()
+
+    @classmethod
+    def from_bytes(cls, payload):
+        """Deserialize a matrix written by to_bytes"""
+        magic, code, fingerprint, rows, cols = _HEADER.unpack_from(payload)
+        if magic != _MAGIC:
+            raise ValueError("Not a DeepGuard feature payload")
+
+        modality = {v: k for k, v in _MODALITY_CODES.items()}.get(code)
+        schema = SCHEMAS.get(modality)
+        if schema is None or schema.fingerprint != fingerprint or cols != len(schema):
+            raise ValueError("Feature payload does not match the current schema")
+
+        data = np.frombuffer(payload, dtype='<f4', count=rows * cols, offset=_HEADER.size)
+        return cls(schema, data.reshape(rows, cols))
@@ -2,7 +2,10 @@ import os
 import magic
 from PyPDF2 import PdfReader
 from docx import Document
+from PIL import Image
+import librosa
 import tempfile
+import zipfile
 
 class FileProcessor:
     def __init__(self):
@@ -28,13 +31,13 @@ class FileProcessor:
         else:
             return "unknown"
     
-    def extract_text(self, file_path):
+    def extract_text(self, file_path, max_pages=None):
         """Extract text from various file formats"""
         file_type = self.detect_file_type(file_path)
         
         try:
             if file_path.endswith('.pdf'):
-                return self._extract_from_pdf(file_path)
+                return self._extract_from_pdf(file_path, max_pages)
             elif file_path.endswith('.docx'):
                 return self._extract_from_docx(file_path)
             elif file_path.endswith('.txt'):
@@ -45,12 +48,14 @@ class FileProcessor:
             print(f"Error extracting text from {file_path}: {str(e)}")
             return None
     
-    def _extract_from_pdf(self, file_path):
+    def _extract_from_pdf(self, file_path, max_pages=None):
         """Extract text from PDF files"""
         text = ""
         with open(file_path, 'rb') as file:
             reader = PdfReader(file)
-            for page in reader.pages:
+            for i, page in enumerate(reader.pages):
+                if max_pages is not None and i >= max_pages:
+                    break
                 text += page.extract_text() + "\n"
         return text.strip()
     
@@ -77,4 +82,50 @@ class FileProcessor:
             'file_type': self.detect_file_type(file_path),
             'mime_type': self.mime.from_file(file_path)
         }
-      
+    
+    def probe(self, file_path):
+        """Read size-related header fields without decoding the content"""
+        file_type = self.detect_file_type(file_path)
+        info = {'file_type': file_type, 'size': os.path.getsize(file_path)}
+        
+        if file_type == "image":
+            info.update(self._probe_image(file_path))
+        elif file_type == "audio":
+            info.update(self._probe_audio(file_path))
+        elif file_path.endswith('.pdf'):
+            info.update(self._probe_pdf(file_path))
+        elif file_path.endswith('.docx'):
+            info.update(self._probe_docx(file_path))
+        return info
+    
+    def _probe_image(self, file_path):
+        """Get image dimensions from the file header"""
+        # Image.open only parses the header; pixel data is decoded lazily
+        with Image.open(file_path) as image:
+            width, height = image.size
+            channels = len(image.getbands())
+            image_format = image.format
+        return {'width': width, 'height': height, 'channels': channels, 'format': image_format}
+    
+    def _probe_audio(self, file_path):
+        """Get audio duration and sample rate from the file header"""
+        return {
+            'duration': librosa.get_duration(path=file_path),
+            'sample_rate': librosa.get_samplerate(file_path)
+        }
+    
+    def _probe_pdf(self, file_path):
+        """Get the PDF page count without extracting any text"""
+        with open(file_path, 'rb') as file:
+            return {'page_count': len(PdfReader(file).pages)}
+    
+    def _probe_docx(self, file_path):
+        """Get the expanded size of a DOCX from its ZIP directory"""
+        # Only the central directory is read; no member is decompressed
+        with zipfile.ZipFile(file_path) as archive:
+            members = archive.infolist()
+        return {
+            'uncompressed_size': sum(member.file_size for member in members),
+            'xml_size': sum(member.file_size for member in members
+                            if member.filename.endswith(('.xml', '.rels')))
+        }
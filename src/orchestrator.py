@@ -0,0 +1,321 @@
+import asyncio
+import functools
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from src.admission import AdmissionRejected
+
+class AnalysisJob:
+    """A single item to analyze: a file path or raw text for one modality"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, modality, path=None, text=None, name=None, timeout=None, job_id=None, options=None):
+        if path is None and text is None:
+            raise ValueError("AnalysisJob needs either a path or text")
+        if text is not None and modality != "text":
+            raise ValueError("Raw text input is only valid for the text modality")
+
+        self.job_id = job_id if job_id is not None else next(self._ids)
+        self.modality = modality
+        self.path = path
+        self.text = text
+        self.name = name or (os.path.basename(path) if path else "Direct Input")
+        self.timeout = timeout
+        self.options = options or {}
+
+class AnalysisOrchestrator:
+    """Schedule detector calls onto executors with per-modality limits"""
+
+    DEFAULT_LIMITS = {'text': 4, 'image': 2, 'audio': 1}
+    DEFAULT_TIMEOUTS = {'text': 30.0, 'image': 60.0, 'audio': 120.0}
+    BUDGET_POLL_INTERVAL = 0.05
+    AUDIO_TIMEOUT_PER_SECOND = 1.0  # Analysis budget per second of admitted audio
+
+    def __init__(self, text_detector=None, image_detector=None, audio_detector=None,
+                 file_processor=None, limits=None, timeouts=None, io_workers=4, admission=None):
+        self.file_processor = file_processor
+        self.admission = admission
+        self.analyzers = {
+            'text': text_detector.analyze_text if text_detector else None,
+            'image': image_detector.analyze_image if image_detector else None,
+            'audio': audio_detector.analyze_audio if audio_detector else None,
+        }
+        self.limits = dict(self.DEFAULT_LIMITS, **(limits or {}))
+        self.timeouts = dict(self.DEFAULT_TIMEOUTS, **(timeouts or {}))
+
+        # One pool per modality so a backlog of audio never starves text,
+        # plus a separate pool for I/O-bound text extraction
+        self._executors = {
+            modality: ThreadPoolExecutor(max_workers=limit, thread_name_prefix=f"deepguard-{modality}")
+            for modality, limit in self.limits.items()
+        }
+        self._io_executor = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="deepguard-io")
+        self._semaphores = {}
+        self._tasks = {}
+        self._workers = {}
+
+    def job_for_file(self, path, name=None, timeout=None):
+        """Build an AnalysisJob for a file, inferring the modality from its name"""
+        if self.file_processor is None:
+            raise ValueError("A FileProcessor is required to infer file modality")
+        modality = self.file_processor.detect_file_type(name or path)
+        return AnalysisJob(modality, path=path, name=name, timeout=timeout)
+
+    async def analyze(self, job, on_idle=None):
+        """Run one job to completion, never raising for analysis failures"""
+        # on_idle runs once every worker thread the job started has finished,
+        # which can be well after a timed-out or cancelled job has returned
+        start_time = time.time()
+        task = asyncio.current_task()
+        if task is not None:
+            self._tasks[job.job_id] = task
+
+        try:
+            if self.analyzers.get(job.modality) is None:
+                return self._job_result(job, self._error_result(
+                    f'Unsupported modality: {job.modality}', start_time), 'error')
+
+            result = await self._run_job(job)
+            status = 'error' if 'error' in result else 'done'
+            return self._job_result(job, result, status)
+
+        except AdmissionRejected as e:
+            return self._job_result(job, self._error_result(
+                f'Rejected: {str(e)}', start_time), 'rejected')
+        except asyncio.TimeoutError:
+            return self._job_result(job, self._error_result(
+                'Analysis timed out', start_time), 'timeout')
+        except asyncio.CancelledError:
+            return self._job_result(job, self._error_result(
+                'Analysis cancelled', start_time), 'cancelled')
+        except Exception as e:
+            return self._job_result(job, self._error_result(
+                f'Analysis error: {str(e)}', start_time), 'error')
+        finally:
+            self._tasks.pop(job.job_id, None)
+            workers = self._workers.pop(job.job_id, [])
+            if on_idle is not None:
+                self._call_when_done(workers, on_idle)
+
+    async def iter_results(self, jobs):
+        """Yield job results as each one finishes, in completion order"""
+        tasks = [asyncio.ensure_future(self.analyze(job)) for job in jobs]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # Consumer stopped early: don't leave orphaned work behind
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def analyze_all(self, jobs):
+        """Run all jobs concurrently and return results in submission order"""
+        return list(await asyncio.gather(*(self.analyze(job) for job in jobs)))
+
+    def cancel(self, job_id):
+        """Cancel a pending or running job, returning True if it was found"""
+        task = self._tasks.get(job_id)
+        if task is None or task.done():
+            return False
+        task.cancel()
+        return True
+
+    def shutdown(self, wait=True):
+        """Release the executor threads"""
+        for executor in self._executors.values():
+            executor.shutdown(wait=wait)
+        self._io_executor.shutdown(wait=wait)
+
+    async def _run_job(self, job):
+        # The timeout covers extraction and analysis, not time spent queued
+        timeout = job.timeout if job.timeout is not None else self.timeouts.get(job.modality)
+
+        decision = await self._admit(job)
+        options = dict(job.options)
+        nbytes = 0
+        if decision is not None:
+            options.update(decision.options)
+            nbytes = decision.estimated_bytes
+
+            # Long recordings need longer than the flat default, scaled to what will actually be analyzed
+            admitted_seconds = decision.options.get('duration', decision.info.get('duration'))
+            if job.modality == 'audio' and job.timeout is None and admitted_seconds and timeout is not None:
+                timeout = max(timeout, admitted_seconds * self.AUDIO_TIMEOUT_PER_SECOND)
+
+        if job.modality == 'text':
+            text = job.text
+            if text is None:
+                if self.file_processor is None:
+                    raise ValueError("A FileProcessor is required to extract text from files")
+                # Take the text slot before the memory, so a backlog of documents waits
+                # without holding budget; extraction and analysis then share the slot
+                loop = asyncio.get_running_loop()
+                semaphore = self._semaphore('text')
+                release = self._releaser(loop, semaphore, nbytes)
+                await self._acquire(semaphore, nbytes)
+                started = loop.create_future()
+                try:
+                    extraction = self._track(job, self._io_executor.submit(self._mark_started(
+                        loop, started, functools.partial(self.file_processor.extract_text, job.path, **options))))
+                except BaseException:
+                    release()
+                    raise
+                try:
+                    # The I/O pool is shared with admission checks, so start the clock
+                    # only once a worker has picked the extraction up
+                    pending = asyncio.wrap_future(extraction)
+                    await asyncio.wait([started, pending], return_when=asyncio.FIRST_COMPLETED)
+                    started_at = started.result() if started.done() else time.time()
+                    text = await asyncio.wait_for(pending, timeout)
+                except (asyncio.TimeoutError, asyncio.CancelledError):
+                    # The worker may still be parsing; free the memory only once it stops.
+                    # An extraction still queued behind admission checks is dropped.
+                    extraction.cancel()
+                    extraction.add_done_callback(release)
+                    raise
+                except BaseException:
+                    release()
+                    raise
+                if not text:
+                    release()
+                    return self._error_result('Could not extract text from the file', started_at)
+                if timeout is not None:
+                    timeout = max(0.0, timeout - (time.time() - started_at))
+                result = await self._submit(job, text, timeout, nbytes=nbytes, held=True)
+            else:
+                result = await self._submit(job, text, timeout)
+        else:
+            result = await self._submit(job, job.path, timeout, options, nbytes)
+
+        if decision is not None and decision.action == 'downsample':
+            result = dict(result, admission={'action': decision.action, 'reason': decision.reason})
+        return result
+
+    async def _admit(self, job):
+        # Only file inputs need header checks; raw text is already in memory
+        if self.admission is None or job.path is None:
+            return None
+        decision = await asyncio.wrap_future(self._track(job, self._io_executor.submit(self.admission.assess, job.path)))
+        if not decision.admitted:
+            raise AdmissionRejected(decision.reason)
+        return decision
+
+    async def _acquire(self, semaphore, nbytes):
+        # Reserve memory only once a slot is free, so queued jobs don't hold budget
+        await semaphore.acquire()
+        try:
+            await self._reserve(nbytes)
+        except BaseException:
+            semaphore.release()
+            raise
+
+    async def _reserve(self, nbytes):
+        if self.admission is None or not nbytes:
+            return
+        while not self.admission.budget.try_reserve(nbytes):
+            await asyncio.sleep(self.BUDGET_POLL_INTERVAL)
+
+    def _release(self, nbytes):
+        if self.admission is not None and nbytes:
+            self.admission.budget.release(nbytes)
+
+    async def _submit(self, job, source, timeout, options=None, nbytes=0, held=False):
+        modality = job.modality
+        semaphore = self._semaphore(modality)
+        release = self._releaser(asyncio.get_running_loop(), semaphore, nbytes)
+
+        # A caller that already holds the slot and memory hands them over here,
+        # and they must be returned even if submission fails
+        if not held:
+            await self._acquire(semaphore, nbytes)
+        try:
+            future = self._track(job, self._executors[modality].submit(
+                self.analyzers[modality], source, **(options or {})))
+        except BaseException:
+            release()
+            raise
+
+        # Hold the slot and the memory until the worker thread is actually free,
+        # even if the awaiting coroutine times out or is cancelled first
+        future.add_done_callback(release)
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+
+    def _releaser(self, loop, semaphore, nbytes):
+        # Safe to call from a worker thread, e.g. as an executor done-callback
+        def release(_=None):
+            self._release(nbytes)
+            try:
+                loop.call_soon_threadsafe(semaphore.release)
+            except RuntimeError:
+                pass  # Event loop already closed
+        return release
+
+    def _mark_started(self, loop, started, func):
+        # Resolve `started` with the wall-clock start time from the worker thread
+        def run():
+            start_time = time.time()
+            try:
+                loop.call_soon_threadsafe(lambda: started.done() or started.set_result(start_time))
+            except RuntimeError:
+                pass  # Event loop already closed
+            return func()
+        return run
+
+    def _track(self, job, future):
+        self._workers.setdefault(job.job_id, []).append(future)
+        return future
+
+    def _call_when_done(self, futures, callback):
+        pending = [future for future in futures if not future.done()]
+        if not pending:
+            callback()
+            return
+
+        remaining = [len(pending)]
+        lock = threading.Lock()
+
+        def done(_):
+            with lock:
+                remaining[0] -= 1
+                finished = remaining[0] == 0
+            if finished:
+                callback()
+
+        for future in pending:
+            future.add_done_callback(done)
+
+    def _semaphore(self, modality):
+        # Semaphores are bound to the running loop, so key them per loop
+        loop = asyncio.get_running_loop()
+        key = (id(loop), modality)
+        if key not in self._semaphores:
+            self._semaphores[key] = asyncio.Semaphore(self.limits[modality])
+        return self._semaphores[key]
+
+    def _job_result(self, job, result, status):
+        result = dict(result)
+        result.update({
+            'job_id': job.job_id,
+            'name': job.name,
+            'modality': job.modality,
+            'status': status
+        })
+        return result
+
+    def _error_result(self, message, start_time):
+        return {
+            'is_ai_generated': False,
+            'confidence': 0.5,
+            'error': message,
+            'processing_time': time.time() - start_time
+        }
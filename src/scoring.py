@@ -0,0 +1,187 @@
+import numpy as np
+import json
+import joblib
+import os
+from src.feature_schema import SCHEMAS, FeatureRecord
+
+ARTIFACT_VERSION = 1
+DEFAULT_CONFIG_PATH = "config/scoring.json"
+
+DEFAULT_THRESHOLDS = {'text': 0.6, 'image': 0.7, 'audio': 0.65}
+
+# (feature, operator, value, score adjustment), applied in order from a 0.5 base
+DEFAULT_RULES = {
+    'image': [
+        ('edge_density', '<', 0.01, 0.2),  # Very smooth images often AI-generated
+        ('noise_level', '<', 100, 0.1),  # Very clean images
+        ('high_freq_energy', '>', 100, -0.1),  # High frequency content often indicates real photos
+    ],
+    'audio': [
+        ('zero_crossing_rate', '<', 0.01, 0.15),  # Very smooth audio often synthetic
+        ('spectral_centroid_std', '<', 100, 0.1),  # Limited spectral variation
+        ('harmonic_ratio', '>', 0.9, 0.1),  # Very harmonic content
+    ],
+}
+
+_OPERATORS = {
+    '<': np.less,
+    '<=': np.less_equal,
+    '>': np.greater,
+    '>=': np.greater_equal,
+}
+
+class BaseScorer:
+    """Score whole feature matrices at once"""
+
+    kind = None
+
+    def __init__(self, schema, threshold):
+        self.schema = schema
+        self.threshold = threshold
+
+    def score(self, matrix):
+        """Return AI probabilities for every row of a FeatureMatrix"""
+        # Stored rows are float32, so values within float32 rounding of a rule
+        # cut (e.g. noise_level 99.999999 -> 100.0) can land on the other side
+        return self.score_array(matrix.data.astype(np.float64))
+
+    def score_record(self, record):
+        """Return the AI probability for a single FeatureRecord or feature dict"""
+        # Score the record's own values, without a float32 round trip
+        if isinstance(record, FeatureRecord):
+            values = record.values
+        else:
+            values = FeatureRecord.from_dict(self.schema, record, dtype=np.float64).values
+        return float(self.score_array(values.astype(np.float64).reshape(1, -1))[0])
+
+    def score_array(self, data):
+        """Return AI probabilities for an (n, features) float64 array"""
+        raise NotImplementedError
+
+    def predict(self, matrix):
+        """Return probabilities, decisions and confidences for every row"""
+        probabilities = self.score(matrix)
+        return {
+            'ai_probability': probabilities,
+            'is_ai_generated': probabilities > self.threshold,
+            'confidence': np.abs(probabilities - 0.5) * 2
+        }
+
+    def to_artifact(self):
+        raise NotImplementedError
+
+class RuleScorer(BaseScorer):
+    """Additive rule table compiled to NumPy masks"""
+
+    kind = 'rules'
+
+    def __init__(self, schema, rules, base=0.5, threshold=0.5):
+        super().__init__(schema, threshold)
+        for feature, operator, _, _ in rules:
+            if feature not in schema.index:
+                raise ValueError(f"Unknown {schema.modality} feature in rule: {feature}")
+            if operator not in _OPERATORS:
+                raise ValueError(f"Unsupported rule operator: {operator}")
+        self.rules = [tuple(rule) for rule in rules]
+        self.base = base
+
+    def score_array(self, data):
+        scores = np.full(len(data), self.base, dtype=np.float64)
+        for feature, operator, value, delta in self.rules:
+            mask = _OPERATORS[operator](data[:, self.schema.index[feature]], value)
+            scores += np.where(mask, delta, 0.0)
+
+        # Normalize to [0, 1]
+        return np.clip(scores, 0, 1)
+
+    def to_artifact(self):
+        return {'base': self.base, 'rules': [list(rule) for rule in self.rules]}
+
+class LinearScorer(BaseScorer):
+    """Logistic model over a subset of schema features"""
+
+    kind = 'linear'
+
+    def __init__(self, schema, feature_names, weights, bias=0.0, threshold=0.5):
+        super().__init__(schema, threshold)
+        self.feature_names = list(feature_names)
+        self.columns = [schema.index[name] for name in self.feature_names]
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.bias = float(bias)
+
+    def score_array(self, data):
+        logits = data[:, self.columns] @ self.weights + self.bias
+        return 1 / (1 + np.exp(-logits))
+
+    def to_artifact(self):
+        return {'feature_names': self.feature_names, 'weights': self.weights.tolist(), 'bias': self.bias}
+
+class EstimatorScorer(BaseScorer):
+    """Wrap a fitted scikit-learn classifier, e.g. a small decision tree"""
+
+    kind = 'estimator'
+
+    def __init__(self, schema, feature_names, estimator, threshold=0.5):
+        super().__init__(schema, threshold)
+        self.feature_names = list(feature_names)
+        self.columns = [schema.index[name] for name in self.feature_names]
+        self.estimator = estimator
+
+    def score_array(self, data):
+        return self.estimator.predict_proba(data[:, self.columns])[:, 1]
+
+    def to_artifact(self):
+        return {'feature_names': self.feature_names, 'estimator': self.estimator}
+
+_SCORER_KINDS = {cls.kind: cls for cls in (RuleScorer, LinearScorer, EstimatorScorer)}
+
+def save_scorer(scorer, path):
+    """Write a scorer to a versioned joblib artifact"""
+    artifact = scorer.to_artifact()
+    artifact.update({
+        'format_version': ARTIFACT_VERSION,
+        'modality': scorer.schema.modality,
+        'kind': scorer.kind
+    })
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    joblib.dump(artifact, path)
+
+def load_scorer_artifact(path, threshold):
+    """Load a scorer written by save_scorer"""
+    artifact = dict(joblib.load(path))
+    version = artifact.pop('format_version', None)
+    if version != ARTIFACT_VERSION:
+        raise ValueError(f"Unsupported scorer artifact version: {version}")
+
+    schema = SCHEMAS[artifact.pop('modality')]
+    scorer_cls = _SCORER_KINDS.get(artifact.pop('kind'))
+    if scorer_cls is None:
+        raise ValueError(f"Unknown scorer kind in {path}")
+    return scorer_cls(schema, threshold=threshold, **artifact)
+
+def load_scoring_config(path=None):
+    """Read per-deployment scoring settings, falling back to the defaults"""
+    path = path or os.environ.get("DEEPGUARD_SCORING_CONFIG", DEFAULT_CONFIG_PATH)
+    config = {modality: {'threshold': threshold} for modality, threshold in DEFAULT_THRESHOLDS.items()}
+
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as file:
+            for modality, settings in json.load(file).items():
+                config.setdefault(modality, {}).update(settings)
+    return config
+
+def get_threshold(modality, config=None):
+    """Return the configured decision threshold for a modality"""
+    config = config or load_scoring_config()
+    return config[modality]['threshold']
+
+def get_scorer(modality, config=None):
+    """Build the configured scorer for a modality, defaulting to the built-in rules"""
+    config = config or load_scoring_config()
+    settings = config[modality]
+
+    if settings.get('artifact'):
+        return load_scorer_artifact(settings['artifact'], settings['threshold'])
+    return RuleScorer(SCHEMAS[modality], DEFAULT_RULES[modality], threshold=settings['threshold'])
@@ -0,0 +1,263 @@
+import numpy as np
+import cv2
+import re
+import threading
+import zlib
+import joblib
+import os
+
+INDEX_PATH = "models/similarity_index.pkl"
+
+def image_phash(gray):
+    """Compute a 64-bit DCT perceptual hash from a grayscale image"""
+    small = cv2.resize(gray, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low_freq = cv2.dct(small)[:8, :8].flatten()
+
+    # Compare against the median of the AC terms; the DC term only tracks brightness
+    bits = low_freq > np.median(low_freq[1:])
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+# Set-bit counts for every byte value, for vectorized Hamming distances
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+def hamming_distances(hashes, phash):
+    """Count differing bits between each uint64 hash and phash"""
+    xored = np.ascontiguousarray(hashes, dtype=np.uint64).reshape(-1) ^ np.uint64(phash)
+    return _POPCOUNT[xored.view(np.uint8)].reshape(-1, 8).sum(axis=1)
+
+def text_shingles(text, size=3):
+    """Split text into lowercase word n-grams hashed to 32-bit integers"""
+    words = re.findall(r'\w+', text.lower())
+    if len(words) < size:
+        words = words + [''] * (size - len(words))
+    return np.unique(np.array(
+        [zlib.crc32(' '.join(words[i:i + size]).encode('utf-8')) for i in range(len(words) - size + 1)],
+        dtype=np.uint64
+    ))
+
+class _LSHTable:
+    """Banded hash table backed by sorted NumPy arrays plus a small insert buffer"""
+
+    MIN_PENDING = 1024
+
+    def __init__(self, n_bands, sig_width, sig_dtype):
+        self.n_bands = n_bands
+        # Verdicts are stored as columns beside the signatures; a dict per
+        # entry would cost several times more than the hash itself
+        self.keys = []
+        self._is_ai = np.empty(0, dtype=bool)
+        self._confidence = np.empty(0, dtype=np.float64)
+        self._probability = np.empty(0, dtype=np.float64)
+        self._pending_verdicts = []
+        self._keys = np.empty((0, n_bands), dtype=np.uint64)
+        self._sigs = np.empty((0, sig_width), dtype=sig_dtype)
+        self._sorted = [np.empty(0, dtype=np.uint64) for _ in range(n_bands)]
+        self._order = [np.empty(0, dtype=np.int64) for _ in range(n_bands)]
+        self._pending_keys = []
+        self._pending_sigs = []
+        self._pending_buckets = [{} for _ in range(n_bands)]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, band_keys, signature, is_ai, confidence, probability, key=None):
+        row = len(self.keys)
+        self.keys.append(key)
+        self._pending_verdicts.append((is_ai, confidence, probability))
+        self._pending_keys.append(band_keys)
+        self._pending_sigs.append(signature)
+        for band, key in enumerate(band_keys):
+            self._pending_buckets[band].setdefault(int(key), []).append(row)
+
+        # Amortize the re-sort: only merge once the buffer is a fraction of the table
+        if len(self._pending_keys) >= max(self.MIN_PENDING, len(self._keys) // 10):
+            self.merge()
+
+    def best_match(self, band_keys, similarity, threshold):
+        """Return (row, similarity) of the most similar row sharing any band, or (None, threshold)"""
+        # Whole buckets are scored, so crowded ones (e.g. near-blank images) cost
+        # time proportional to their size rather than silently dropping rows
+        parts = []
+        for band, key in enumerate(band_keys):
+            sorted_keys = self._sorted[band]
+            lo = np.searchsorted(sorted_keys, key, side='left')
+            hi = np.searchsorted(sorted_keys, key, side='right')
+            parts.append(self._order[band][lo:hi])
+            parts.append(np.asarray(self._pending_buckets[band].get(int(key), ()), dtype=np.int64))
+        rows = np.unique(np.concatenate(parts))
+        if not len(rows):
+            return None, threshold
+
+        scores = similarity(self._signatures(rows))
+        best = int(np.argmax(scores))
+        if scores[best] < threshold:
+            return None, threshold
+        return int(rows[best]), float(scores[best])
+
+    def verdict(self, row):
+        """Return the stored verdict for a row as a dict"""
+        n_main = len(self._sigs)
+        if row < n_main:
+            is_ai, confidence, probability = self._is_ai[row], self._confidence[row], self._probability[row]
+        else:
+            is_ai, confidence, probability = self._pending_verdicts[row - n_main]
+        return {
+            'is_ai_generated': bool(is_ai),
+            'confidence': float(confidence),
+            'ai_probability': float(probability),
+            'key': self.keys[row]
+        }
+
+    def _signatures(self, rows):
+        n_main = len(self._sigs)
+        main = self._sigs[rows[rows < n_main]]
+        pending = [self._pending_sigs[row - n_main] for row in rows[rows >= n_main]]
+        if not pending:
+            return main
+        return np.vstack([main, np.array(pending, dtype=self._sigs.dtype)])
+
+    def merge(self):
+        """Fold buffered inserts into the sorted arrays"""
+        if not self._pending_keys:
+            return
+        self._keys = np.vstack([self._keys, np.array(self._pending_keys, dtype=np.uint64)])
+        self._sigs = np.vstack([self._sigs, np.array(self._pending_sigs, dtype=self._sigs.dtype)])
+        is_ai, confidence, probability = zip(*self._pending_verdicts)
+        self._is_ai = np.concatenate([self._is_ai, np.array(is_ai, dtype=bool)])
+        self._confidence = np.concatenate([self._confidence, np.array(confidence, dtype=np.float64)])
+        self._probability = np.concatenate([self._probability, np.array(probability, dtype=np.float64)])
+        for band in range(self.n_bands):
+            order = np.argsort(self._keys[:, band], kind='stable')
+            self._order[band] = order
+            self._sorted[band] = self._keys[order, band]
+        self._pending_keys = []
+        self._pending_sigs = []
+        self._pending_verdicts = []
+        self._pending_buckets = [{} for _ in range(self.n_bands)]
+
+class NearDuplicateIndex:
+    """Similarity index returning prior verdicts for near-duplicate images and text"""
+
+    MAX_IMAGE_BANDS = 16  # Narrower than 4-bit chunks, buckets stop being selective
+
+    def __init__(self, image_threshold=0.85, text_threshold=0.8, num_perm=64, text_bands=16, seed=42):
+        if num_perm % text_bands:
+            raise ValueError("num_perm must be divisible by text_bands")
+
+        # Split the 64-bit pHash into one more chunk than the allowed Hamming
+        # distance, so every hash within the threshold shares a chunk exactly
+        max_distance = int(np.floor(64 * (1 - image_threshold) + 1e-9))
+        if max_distance + 1 > self.MAX_IMAGE_BANDS:
+            raise ValueError(
+                f"image_threshold must be at least {1 - (self.MAX_IMAGE_BANDS - 1) / 64:.3f} "
+                f"for exact near-duplicate recall"
+            )
+        self._image_spans = [(int(bits[0]), len(bits)) for bits in np.array_split(np.arange(64), max_distance + 1)]
+
+        self.image_threshold = image_threshold
+        self.text_threshold = text_threshold
+        self.num_perm = num_perm
+        self.text_bands = text_bands
+
+        # Multiply-shift hash family: (a * x + b) mod 2**64, keeping the top 32 bits
+        rng = np.random.RandomState(seed)
+        self._perm_a = rng.randint(0, 2**63, size=num_perm, dtype=np.int64).astype(np.uint64) * np.uint64(2) + np.uint64(1)
+        self._perm_b = rng.randint(0, 2**63, size=num_perm, dtype=np.int64).astype(np.uint64) * np.uint64(2)
+        self._band_mix = (rng.randint(1, 2**62, size=num_perm // text_bands, dtype=np.int64) | 1).astype(np.uint64)
+
+        self._images = _LSHTable(len(self._image_spans), 1, np.uint64)
+        self._texts = _LSHTable(text_bands, num_perm, np.uint32)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._images) + len(self._texts)
+
+    def add_image(self, gray, verdict, key=None):
+        """Record the verdict for a grayscale image"""
+        phash = image_phash(gray)
+        with self._lock:
+            self._images.add(self._image_bands(phash), [phash], *self._compact_verdict(verdict), key=key)
+
+    def lookup_image(self, gray):
+        """Return the nearest prior verdict for a grayscale image, or None"""
+        phash = image_phash(gray)
+        with self._lock:
+            best_row, best_similarity = self._images.best_match(
+                self._image_bands(phash),
+                lambda hashes: 1 - hamming_distances(hashes, phash) / 64,
+                self.image_threshold
+            )
+            return self._match(self._images, best_row, best_similarity)
+
+    def add_text(self, text, verdict, key=None):
+        """Record the verdict for a piece of text"""
+        signature = self.minhash(text)
+        with self._lock:
+            self._texts.add(self._text_bands(signature), signature, *self._compact_verdict(verdict), key=key)
+
+    def lookup_text(self, text):
+        """Return the nearest prior verdict for a piece of text, or None"""
+        signature = self.minhash(text)
+        with self._lock:
+            best_row, best_similarity = self._texts.best_match(
+                self._text_bands(signature),
+                lambda signatures: np.mean(signatures == signature, axis=1),
+                self.text_threshold
+            )
+            return self._match(self._texts, best_row, best_similarity)
+
+    def minhash(self, text):
+        """Compute the MinHash signature of a text's word shingles"""
+        shingles = text_shingles(text)
+        hashes = (np.outer(shingles, self._perm_a) + self._perm_b) >> np.uint64(32)
+        return hashes.min(axis=0).astype(np.uint32)
+
+    def save(self, path=INDEX_PATH):
+        """Persist the index to disk"""
+        with self._lock:
+            self._images.merge()
+            self._texts.merge()
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Write beside the target first so a crash never leaves a truncated index
+            tmp_path = path + ".tmp"
+            joblib.dump(self, tmp_path)
+            os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=INDEX_PATH):
+        """Load a persisted index, or start an empty one if none exists"""
+        if os.path.exists(path):
+            return joblib.load(path)
+        return cls()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _image_bands(self, phash):
+        return np.array([(phash >> start) & ((1 << width) - 1) for start, width in self._image_spans], dtype=np.uint64)
+
+    def _text_bands(self, signature):
+        rows = signature.reshape(self.text_bands, -1).astype(np.uint64)
+        return (rows * self._band_mix).sum(axis=1, dtype=np.uint64)
+
+    def _compact_verdict(self, verdict):
+        return (
+            bool(verdict.get('is_ai_generated', False)),
+            float(verdict.get('confidence', 0.5)),
+            float(verdict.get('ai_probability', 0.5))
+        )
+
+    def _match(self, table, row, similarity):
+        if row is None:
+            return None
+        match = table.verdict(row)
+        match['similarity'] = similarity
+        return match
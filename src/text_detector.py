@@ -5,21 +5,25 @@ from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.ensemble import RandomForestClassifier
 import joblib
 import os
+from src.feature_schema import TEXT_SCHEMA, FeatureRecord
+from src.scoring import get_threshold
+
+MODEL_PATH = "models/text_detector_model.pkl"
+VECTORIZER_PATH = "models/text_vectorizer.pkl"
 
 class TextDetector:
-    def __init__(self):
+    def __init__(self, similarity_index=None, threshold=None):
         self.model = None
         self.vectorizer = None
+        self.similarity_index = similarity_index
+        self.threshold = threshold if threshold is not None else get_threshold('text')
         self.load_model()
     
     def load_model(self):
         """Load or initialize the text detection model"""
-        model_path = "models/text_detector_model.pkl"
-        vectorizer_path = "models/text_vectorizer.pkl"
-        
-        if os.path.exists(model_path) and os.path.exists(vectorizer_path):
-            self.model = joblib.load(model_path)
-            self.vectorizer = joblib.load(vectorizer_path)
+        if os.path.exists(MODEL_PATH) and os.path.exists(VECTORIZER_PATH):
+            self.model = joblib.load(MODEL_PATH)
+            self.vectorizer = joblib.load(VECTORIZER_PATH)
         else:
             # Initialize with a simple model for demonstration
             self.vectorizer = TfidfVectorizer(
@@ -58,8 +62,8 @@ class TextDetector:
         
         # Save models
         os.makedirs("models", exist_ok=True)
-        joblib.dump(self.model, "models/text_detector_model.pkl")
-        joblib.dump(self.vectorizer, "models/text_vectorizer.pkl")
+        joblib.dump(self.model, MODEL_PATH)
+        joblib.dump(self.vectorizer, VECTORIZER_PATH)
     
     def analyze_text(self, text):
         """Analyze text for AI generation indicators"""
@@ -74,6 +78,19 @@ class TextDetector:
             }
         
         try:
+            # Reuse the verdict of a previously scored near-duplicate
+            if self.similarity_index is not None:
+                match = self.similarity_index.lookup_text(text)
+                if match is not None:
+                    return {
+                        'is_ai_generated': match['is_ai_generated'],
+                        'confidence': match['confidence'],
+                        'ai_probability': match['ai_probability'],
+                        'near_duplicate': {'key': match['key'], 'similarity': match['similarity']},
+                        'processing_time': time.time() - start_time,
+                        'text_length': len(text)
+                    }
+            
             # Extract features
             features = self._extract_text_features(text)
             
@@ -86,9 +103,9 @@ class TextDetector:
             
             # Determine result
             confidence = abs(ai_probability - 0.5) * 2  # Convert to confidence score
-            is_ai = ai_probability > 0.6  # Threshold for AI detection
+            is_ai = ai_probability > self.threshold  # Threshold for AI detection
             
-            return {
+            result = {
                 'is_ai_generated': is_ai,
                 'confidence': confidence,
                 'ai_probability': ai_probability,
@@ -97,6 +114,11 @@ class TextDetector:
                 'text_length': len(text)
             }
             
+            if self.similarity_index is not None:
+                self.similarity_index.add_text(text, result)
+            
+            return result
+            
         except Exception as e:
             return {
                 'is_ai_generated': False,
@@ -112,7 +134,7 @@ class TextDetector:
         sentences = re.split(r'[.!?]+', text)
         sentences = [s.strip() for s in sentences if s.strip()]
         
-        features = {
+        features = FeatureRecord.from_dict(TEXT_SCHEMA, {
             'word_count': len(words),
             'sentence_count': len(sentences),
             'avg_sentence_length': len(words) / len(sentences) if sentences else 0,
@@ -121,7 +143,7 @@ class TextDetector:
             'punctuation_density': len(re.findall(r'[^\w\s]', text)) / len(text) if text else 0,
             'uppercase_ratio': sum(1 for c in text if c.isupper()) / len(text) if text else 0,
             'digit_ratio': sum(1 for c in text if c.isdigit()) / len(text) if text else 0
-        }
+        }, dtype=np.float64)
         
         # Readability scores (simplified)
         if sentences and words:
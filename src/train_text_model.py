@@ -0,0 +1,209 @@
+"""Train the text detection model out of core from labeled JSONL or Parquet.
+
+Example:
+    python -m src.train_text_model data/labeled.jsonl --chunk-size 20000 --workers 4
+"""
+import argparse
+import json
+import os
+import time
+import joblib
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+from src.text_detector import MODEL_PATH, VECTORIZER_PATH
+
+CLASSES = np.array([0, 1])  # 0=human, 1=AI
+LABEL_NAMES = {'human': 0, 'ai': 1}
+
+def build_vectorizer(n_features=2**20):
+    """Stateless vectorizer, so chunks can be transformed independently"""
+    return HashingVectorizer(
+        n_features=n_features,
+        stop_words='english',
+        ngram_range=(1, 2),
+        alternate_sign=False
+    )
+
+def parse_label(value):
+    """Map 0/1, booleans or 'human'/'ai' to a class id"""
+    if isinstance(value, str):
+        if value.lower() in LABEL_NAMES:
+            return LABEL_NAMES[value.lower()]
+        value = int(value)
+    label = int(value)
+    if label not in (0, 1):
+        raise ValueError(f"Unsupported label: {value}")
+    return label
+
+def iter_jsonl_chunks(path, chunk_size, text_field='text', label_field='label'):
+    """Yield (texts, labels) chunks from a JSON Lines file"""
+    texts, labels = [], []
+    with open(path, 'r', encoding='utf-8') as file:
+        for line in file:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            texts.append(record[text_field])
+            labels.append(parse_label(record[label_field]))
+            if len(texts) >= chunk_size:
+                yield texts, labels
+                texts, labels = [], []
+    if texts:
+        yield texts, labels
+
+def iter_parquet_chunks(path, chunk_size, text_field='text', label_field='label'):
+    """Yield (texts, labels) chunks from a Parquet file, one record batch at a time"""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Reading Parquet requires pyarrow: pip install pyarrow")
+
+    parquet_file = pq.ParquetFile(path)
+    for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=[text_field, label_field]):
+        columns = batch.to_pydict()
+        yield columns[text_field], [parse_label(label) for label in columns[label_field]]
+
+def iter_chunks(path, chunk_size, text_field='text', label_field='label'):
+    """Dispatch to a chunk reader based on the file extension"""
+    if path.endswith('.parquet'):
+        return iter_parquet_chunks(path, chunk_size, text_field, label_field)
+    return iter_jsonl_chunks(path, chunk_size, text_field, label_field)
+
+def _vectorize_chunk(vectorizer, texts, labels):
+    return vectorizer.transform(texts), np.asarray(labels)
+
+class TextModelTrainer:
+    """Incrementally fit an SGD logistic model over hashed text features"""
+
+    def __init__(self, model_path=MODEL_PATH, vectorizer_path=VECTORIZER_PATH,
+                 checkpoint_path="models/text_training_checkpoint.pkl", n_features=2**20):
+        self.model_path = model_path
+        self.vectorizer_path = vectorizer_path
+        self.checkpoint_path = checkpoint_path
+        self.vectorizer = build_vectorizer(n_features)
+        self.model = SGDClassifier(loss='log_loss', alpha=1e-6, random_state=42)
+        self.chunks_done = 0
+        self.samples_seen = 0
+        self.source = None
+        self.chunk_size = None
+
+    def resume(self):
+        """Restore model state from the last checkpoint, if there is one"""
+        if not os.path.exists(self.checkpoint_path):
+            return False
+        checkpoint = joblib.load(self.checkpoint_path)
+        self.model = checkpoint['model']
+        self.vectorizer = checkpoint['vectorizer']
+        self.chunks_done = checkpoint['chunks_done']
+        self.samples_seen = checkpoint['samples_seen']
+        self.source = checkpoint['source']
+        self.chunk_size = checkpoint['chunk_size']
+        return True
+
+    def train(self, path, chunk_size=10000, workers=None, checkpoint_every=10,
+              text_field='text', label_field='label'):
+        """Stream the corpus through the model and write the detector artifacts"""
+        workers = workers or os.cpu_count() or 1
+        start_time = time.time()
+        source = os.path.abspath(path)
+
+        # Resuming skips whole chunks, which is only valid for the same file and chunking
+        if self.chunks_done and (source != self.source or chunk_size != self.chunk_size):
+            raise ValueError(
+                f"Checkpoint was written for {self.source} with chunk size {self.chunk_size}; "
+                f"resume with the same settings or pass --fresh"
+            )
+        self.source = source
+        self.chunk_size = chunk_size
+        chunks = iter_chunks(path, chunk_size, text_field, label_field)
+
+        # Skip chunks already folded into a resumed model
+        for _ in range(self.chunks_done):
+            next(chunks, None)
+
+        # Keep a bounded number of chunks in flight so memory does not grow with the corpus
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = []
+            for texts, labels in chunks:
+                pending.append(executor.submit(_vectorize_chunk, self.vectorizer, texts, labels))
+                if len(pending) >= workers * 2:
+                    self._fit_chunk(pending.pop(0).result(), checkpoint_every)
+            for future in pending:
+                self._fit_chunk(future.result(), checkpoint_every)
+
+        # An unfitted model would replace the one TextDetector loads and break it
+        if self.samples_seen == 0:
+            raise ValueError(f"No labeled samples found in {path}; the existing model was left in place")
+
+        self.save()
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+        print(f"Trained on {self.samples_seen} samples in {self.chunks_done} chunks "
+              f"({time.time() - start_time:.1f}s)")
+
+    def save(self):
+        """Write the model and vectorizer in the format TextDetector loads"""
+        # Dump both before replacing either, so a failure never leaves a mismatched pair
+        written = []
+        for obj, path in ((self.model, self.model_path), (self.vectorizer, self.vectorizer_path)):
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            joblib.dump(obj, path + ".tmp")
+            written.append(path)
+        for path in written:
+            os.replace(path + ".tmp", path)
+
+    def checkpoint(self):
+        """Persist enough state to resume after an interruption"""
+        directory = os.path.dirname(self.checkpoint_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.checkpoint_path + ".tmp"
+        joblib.dump({
+            'model': self.model,
+            'vectorizer': self.vectorizer,
+            'chunks_done': self.chunks_done,
+            'samples_seen': self.samples_seen,
+            'source': self.source,
+            'chunk_size': self.chunk_size
+        }, tmp_path)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _fit_chunk(self, chunk, checkpoint_every):
+        X, y = chunk
+        self.model.partial_fit(X, y, classes=CLASSES)
+        self.chunks_done += 1
+        self.samples_seen += len(y)
+
+        if checkpoint_every and self.chunks_done % checkpoint_every == 0:
+            self.checkpoint()
+            print(f"Checkpoint: {self.samples_seen} samples, {self.chunks_done} chunks")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the DeepGuard text model from labeled JSONL or Parquet")
+    parser.add_argument("data", help="Path to a .jsonl or .parquet file with text and label columns")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="Samples per training chunk")
+    parser.add_argument("--workers", type=int, default=None, help="Vectorization processes (default: all cores)")
+    parser.add_argument("--checkpoint-every", type=int, default=10, help="Chunks between checkpoints (0 disables)")
+    parser.add_argument("--text-field", default="text")
+    parser.add_argument("--label-field", default="label")
+    parser.add_argument("--n-features", type=int, default=2**20, help="Hashed feature dimension")
+    parser.add_argument("--model-path", default=MODEL_PATH)
+    parser.add_argument("--vectorizer-path", default=VECTORIZER_PATH)
+    parser.add_argument("--checkpoint-path", default="models/text_training_checkpoint.pkl")
+    parser.add_argument("--fresh", action="store_true", help="Ignore any existing checkpoint")
+    args = parser.parse_args(argv)
+
+    trainer = TextModelTrainer(args.model_path, args.vectorizer_path, args.checkpoint_path, args.n_features)
+    if not args.fresh and trainer.resume():
+        print(f"Resuming after {trainer.chunks_done} chunks ({trainer.samples_seen} samples)")
+
+    trainer.train(args.data, args.chunk_size, args.workers, args.checkpoint_every,
+                  args.text_field, args.label_field)
+
+if __name__ == "__main__":
+    main()